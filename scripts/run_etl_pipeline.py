@@ -14,17 +14,44 @@ from datetime import datetime
 import argparse
 
 from src.validation.validators import DataValidator
+from src.validation.schemas import ValidationReport, SCHEMA_VERSION
 from src.deduplication.dedup_engine import DeduplicationEngine
 from src.loading.sql_loader import SQLLoader, DatabaseConfig
 from src.utils.logging_config import setup_logging, get_logger
 from src.utils.metrics import PipelineMetrics
+from src.utils.cache import StageCache, file_digest
+
+
+# Explicit dtypes avoid type inference on read; low-cardinality columns
+# validated by the schema are loaded as categoricals
+DTYPES = {
+    'numero_operacion': 'object',
+    'tipo_operacion': 'category',
+    'monto': 'float64',
+    'moneda': 'category',
+    'cuenta_origen': 'object',
+    'cuenta_destino': 'object',
+    'banco_origen': 'category',
+    'banco_destino': 'object',
+    'descripcion': 'object',
+    'estado': 'category',
+    'canal': 'category',
+    'content_hash': 'object',
+}
 
 
 class ETLPipeline:
     """Main ETL pipeline orchestrator."""
     
-    def __init__(self, db_config: DatabaseConfig):
+    def __init__(
+        self,
+        db_config: DatabaseConfig,
+        output_format: str = 'parquet',
+        cache_dir: str = None
+    ):
         self.db_config = db_config
+        self.output_format = output_format
+        self.stage_cache = StageCache(cache_dir) if cache_dir else None
         self.logger = get_logger(__name__)
         self.metrics = None
     
@@ -54,9 +81,7 @@ class ETLPipeline:
         )
         
         try:
-            df = self._extract(input_file)
-            
-            df_validated, validation_report = self._validate(df)
+            df_validated, validation_report = self._extract_and_validate(input_file)
             
             df_deduped, dedup_stats = self._deduplicate(df_validated, output_dir)
             
@@ -96,13 +121,39 @@ class ETLPipeline:
         """Extract data from CSV file."""
         self.logger.info("extraction_started", file=input_file)
         
-        df = pd.read_csv(input_file, parse_dates=['fecha_operacion'])
+        df = pd.read_csv(
+            input_file,
+            parse_dates=['fecha_operacion'],
+            dtype=DTYPES,
+            engine='c'
+        )
         self.metrics.input_rows = len(df)
         
         self.logger.info("extraction_completed", rows=len(df))
         
         return df
     
+    def _extract_and_validate(self, input_file: str):
+        """Extract and validate, reusing cached results for unchanged inputs."""
+        if self.stage_cache is None:
+            return self._validate(self._extract(input_file))
+        
+        def compute():
+            validated_df, report = self._validate(self._extract(input_file))
+            return validated_df, report.to_dict()
+        
+        key = f"validation_{file_digest(input_file)}_{SCHEMA_VERSION}"
+        hits_before = self.stage_cache.hits
+        validated_df, report_dict = self.stage_cache.get_or_compute(key, compute)
+        self.metrics.cache_hits = self.stage_cache.hits
+        
+        if self.stage_cache.hits > hits_before:
+            self.metrics.input_rows = report_dict['total_rows']
+            self._record_validation(report_dict)
+            self.logger.info("validation_cache_hit", key=key, valid_rows=len(validated_df))
+        
+        return validated_df, ValidationReport.from_dict(report_dict)
+    
     def _validate(self, df: pd.DataFrame):
         """Validate data with schema checks."""
         self.logger.info("validation_started", input_rows=len(df))
@@ -111,9 +162,7 @@ class ETLPipeline:
         validated_df, report = validator.validate(df)
         
         report_dict = report.to_dict()
-        self.metrics.validation_passed = report_dict['valid_rows']
-        self.metrics.validation_failed = report_dict['invalid_rows']
-        self.metrics.validation_errors = report_dict['errors'][:100]
+        self._record_validation(report_dict)
         
         self.logger.info(
             "validation_completed",
@@ -128,6 +177,12 @@ class ETLPipeline:
         
         return validated_df, report
     
+    def _record_validation(self, report_dict: dict):
+        """Copy validation results into pipeline metrics."""
+        self.metrics.validation_passed = report_dict['valid_rows']
+        self.metrics.validation_failed = report_dict['invalid_rows']
+        self.metrics.validation_errors = report_dict['errors'][:100]
+    
     def _deduplicate(self, df: pd.DataFrame, output_dir: str):
         """Remove duplicate records."""
         self.logger.info("deduplication_started", input_rows=len(df))
@@ -147,8 +202,17 @@ class ETLPipeline:
         
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
-        deduped_file = output_path / f"deduped_{self.metrics.pipeline_id}.csv"
-        deduped_df.to_csv(deduped_file, index=False)
+        if self.output_format == 'csv':
+            deduped_file = output_path / f"deduped_{self.metrics.pipeline_id}.csv"
+            deduped_df.to_csv(deduped_file, index=False)
+        else:
+            deduped_file = output_path / f"deduped_{self.metrics.pipeline_id}.parquet"
+            deduped_df.to_parquet(
+                deduped_file,
+                index=False,
+                compression='snappy',
+                engine='pyarrow'
+            )
         
         return deduped_df, stats
     
@@ -164,7 +228,7 @@ class ETLPipeline:
         loader.connect()
         loader.create_table('operaciones')
         
-        stats = loader.upsert_data(df, 'operaciones')
+        stats = loader.bulk_load(df, 'operaciones')
         
         self.metrics.rows_loaded = stats['rows_inserted']
         self.metrics.rows_updated = stats['rows_updated']
@@ -200,6 +264,17 @@ def main():
         default='sqlserver',
         help="Database type"
     )
+    parser.add_argument(
+        "--output-format",
+        choices=['parquet', 'csv'],
+        default='parquet',
+        help="Format for the intermediate deduplicated file"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Directory for cached stage results (disabled if omitted)"
+    )
     parser.add_argument(
         "--log-level",
         default="INFO",
@@ -226,7 +301,11 @@ def main():
             database='data/etl_conciliacion.db'
         )
     
-    pipeline = ETLPipeline(db_config)
+    pipeline = ETLPipeline(
+        db_config,
+        output_format=args.output_format,
+        cache_dir=args.cache_dir
+    )
     
     print("=" * 70)
     print("ETL PIPELINE EXECUTION")
@@ -4,7 +4,7 @@ Implements hash-based and business-rule deduplication strategies.
 """
 
 import pandas as pd
-import hashlib
+from pandas._libs import hashtable as ht
 from typing import Tuple, List, Dict
 from datetime import datetime
 
@@ -60,13 +60,21 @@ class DeduplicationEngine:
         Deduplicate using content hash.
         Removes exact duplicates based on hash of critical fields.
         """
-        if 'content_hash' not in df.columns:
-            df = self._generate_content_hash(df)
+        if 'content_hash' in df.columns:
+            # Probe pandas' C hashtable directly on the single hash column,
+            # skipping DataFrame.duplicated's subset/dtype handling
+            duplicates_mask = ht.duplicated(df['content_hash'].to_numpy(), keep='first')
+            result_df = df.iloc[~duplicates_mask].reset_index(drop=True)
+        else:
+            # pandas hashes the critical fields internally; no need to
+            # materialize a content_hash column just to compare it
+            result_df = df.drop_duplicates(
+                subset=self._hash_columns(df), keep='first', ignore_index=True
+            )
         
-        duplicates_mask = df.duplicated(subset=['content_hash'], keep='first')
-        self.dedup_stats['duplicates_found'] = duplicates_mask.sum()
+        self.dedup_stats['duplicates_found'] = len(df) - len(result_df)
         
-        return df[~duplicates_mask].reset_index(drop=True)
+        return result_df
     
     def _deduplicate_by_key(
         self,
@@ -77,24 +85,18 @@ class DeduplicationEngine:
         Deduplicate using business key columns.
         Keeps first occurrence of each key.
         """
-        duplicates_mask = df.duplicated(subset=key_columns, keep='first')
-        self.dedup_stats['duplicates_found'] = duplicates_mask.sum()
+        result_df = df.drop_duplicates(subset=key_columns, keep='first', ignore_index=True)
+        self.dedup_stats['duplicates_found'] = len(df) - len(result_df)
         
-        return df[~duplicates_mask].reset_index(drop=True)
+        return result_df
     
-    def _generate_content_hash(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Generate content hash if not already present."""
-        hash_columns = ['numero_operacion', 'monto', 'fecha_operacion', 'cuenta_origen']
-        
-        def create_hash(row):
-            try:
-                content = ''.join(str(row[col]) for col in hash_columns if col in df.columns)
-                return hashlib.sha256(content.encode()).hexdigest()[:16]
-            except Exception:
-                return None
-        
-        df['content_hash'] = df.apply(create_hash, axis=1)
-        return df
+    @staticmethod
+    def _hash_columns(df: pd.DataFrame) -> List[str]:
+        """Critical fields that define record content, when present."""
+        return [
+            col for col in ['numero_operacion', 'monto', 'fecha_operacion', 'cuenta_origen']
+            if col in df.columns
+        ]
     
     def find_duplicates(
         self,
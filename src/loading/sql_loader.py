@@ -4,14 +4,56 @@ Supports SQL Server (Windows Auth) and SQLite.
 """
 
 import pandas as pd
-from sqlalchemy import create_engine, MetaData, Table, Column, Integer, String, Float, DateTime, Index, text
+from sqlalchemy import create_engine, MetaData, Table, Column, Integer, String, Float, DateTime, Index, text, event, inspect, func
 from sqlalchemy.exc import SQLAlchemyError
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Iterator
 from dataclasses import dataclass
 import os
+import re
 from urllib.parse import quote_plus
 from pathlib import Path  
 from sqlalchemy import VARCHAR, FLOAT, DATETIME
+from sqlalchemy.dialects.mssql import VARCHAR as MS_VARCHAR
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pyarrow is optional: falls back to pandas .str slicing
+    pa = None
+
+# Longitud máxima de columnas de texto en SQL Server (nullable, max_len)
+TEXT_LIMITS = {
+    'descripcion': (True, 500),
+    'banco_origen': (False, 50),
+    'banco_destino': (True, 50),
+    'cuenta_origen': (False, 50),
+    'cuenta_destino': (True, 50),
+}
+
+# Filas por bloque al poblar la tabla temporal de SQL Server
+STAGE_CHUNK_ROWS = 50_000
+
+# Columnas y tipos de la tabla temporal #stage usada por el MERGE de SQL Server
+STAGE_DTYPES = {
+    'fecha_operacion': DATETIME(),
+    'numero_operacion': VARCHAR(20),
+    'tipo_operacion': VARCHAR(20),
+    'monto': FLOAT(),
+    'moneda': VARCHAR(3),
+    'cuenta_origen': VARCHAR(50),
+    'cuenta_destino': VARCHAR(50),
+    'banco_origen': VARCHAR(50),
+    'banco_destino': VARCHAR(50),
+    'descripcion': VARCHAR(500),
+    'estado': VARCHAR(20),
+    'canal': VARCHAR(20),
+    'content_hash': VARCHAR(32)
+}
+
+
+def _varchar(length: int):
+    """String column rendered as VARCHAR on SQL Server, matching the #stage types."""
+    return String(length).with_variant(MS_VARCHAR(length), 'mssql')
 
 
 @dataclass
@@ -88,6 +130,7 @@ class SQLLoader:
         self.config = config or DatabaseConfig.from_env()
         self.engine = None
         self.metadata = MetaData()
+        self._columns_cache = {}
         self.load_stats = {
             'rows_inserted': 0,
             'rows_updated': 0,
@@ -104,48 +147,79 @@ class SQLLoader:
             
             if self.config.db_type == 'sqlserver':
                 engine_kwargs['fast_executemany'] = True
+                
+                # fast_executemany depende del driver; versiones antiguas lo ignoran
+                match = re.search(r'ODBC Driver (\d+)', self.config.driver)
+                if match is None or int(match.group(1)) < 17:
+                    print(f"Warning: driver '{self.config.driver}' may not support "
+                          f"fast_executemany; use ODBC Driver 17 or newer")
             
             self.engine = create_engine(connection_string, **engine_kwargs)
             
+            if self.config.db_type == 'sqlite':
+                self._register_sqlite_pragmas()
+            
             with self.engine.connect() as conn:
                 if self.config.db_type == 'sqlserver':
                     result = conn.execute(text("SELECT @@VERSION"))
-                    version = result.fetchone()[0]
+                    version = result.scalar_one()
                     print(f"Connected to SQL Server")
                     print(f"Database: {self.config.database}")
                 elif self.config.db_type == 'sqlite':
                     result = conn.execute(text("SELECT sqlite_version()"))
-                    version = result.fetchone()[0]
+                    version = result.scalar_one()
                     print(f"Connected to SQLite v{version}")
                     print(f"Database: {self.config.database}")
                     
         except Exception as e:
             raise ConnectionError(f"Failed to connect to database: {str(e)}")
     
+    def _register_sqlite_pragmas(self):
+        """Apply WAL and cache PRAGMAs on every new SQLite connection."""
+        in_memory = self.config.database in ('', ':memory:')
+        pragmas = [
+            "synchronous=NORMAL",
+            "temp_store=MEMORY",
+            "cache_size=-65536",
+            "mmap_size=10737418240",
+            "busy_timeout=30000",
+        ]
+        if not in_memory:
+            pragmas.insert(0, "journal_mode=WAL")
+        
+        @event.listens_for(self.engine, "connect")
+        def _set_pragmas(dbapi_conn, _):
+            cursor = dbapi_conn.cursor()
+            for pragma in pragmas:
+                cursor.execute(f"PRAGMA {pragma}")
+            cursor.close()
+    
     def create_table(self, table_name: str = 'operaciones'):
         if self.engine is None:
             self.connect()
 
         schema_kwargs = {'schema': self.config.schema} if self.config.db_type == 'sqlserver' else {}
+        # CURRENT_TIMESTAMP es UTC en SQLite; fecha_carga se guarda en hora local
+        load_default = func.now() if self.config.db_type == 'sqlserver' else text("(datetime('now', 'localtime'))")
 
         operations_table = Table(
             table_name,
             self.metadata,
             Column('id', Integer, primary_key=True, autoincrement=True),
             Column('fecha_operacion', DateTime, nullable=False),
-            Column('numero_operacion', String(20), nullable=False),
-            Column('tipo_operacion', String(20), nullable=False),
+            Column('numero_operacion', _varchar(20), nullable=False),
+            Column('tipo_operacion', _varchar(20), nullable=False),
             Column('monto', Float, nullable=False),
-            Column('moneda', String(3), nullable=False),
-            Column('cuenta_origen', String(50), nullable=False),
-            Column('cuenta_destino', String(50)),
-            Column('banco_origen', String(50), nullable=False),
-            Column('banco_destino', String(50)),
-            Column('descripcion', String(500)),
-            Column('estado', String(20), nullable=False),
-            Column('canal', String(20), nullable=False),
-            Column('content_hash', String(32)),
-            Column('fecha_carga', DateTime),
+            Column('moneda', _varchar(3), nullable=False),
+            Column('cuenta_origen', _varchar(50), nullable=False),
+            Column('cuenta_destino', _varchar(50)),
+            Column('banco_origen', _varchar(50), nullable=False),
+            Column('banco_destino', _varchar(50)),
+            Column('descripcion', _varchar(500)),
+            Column('estado', _varchar(20), nullable=False),
+            Column('canal', _varchar(20), nullable=False),
+            Column('content_hash', _varchar(32)),
+            Column('fecha_carga', DateTime, server_default=load_default),
             Column('is_duplicate', Integer, nullable=True),
             Index('idx_numero_operacion', 'numero_operacion'),
             Index('idx_fecha_operacion', 'fecha_operacion'),
@@ -157,31 +231,87 @@ class SQLLoader:
         shown_name = f"{self.config.schema}.{table_name}" if self.config.db_type == 'sqlserver' else table_name
         print(f"Table '{shown_name}' created/verified")
 
-        if self.config.db_type == 'sqlserver':
-            self._create_unique_constraint(table_name)
-
+        self._ensure_load_default(table_name)
+        self._create_unique_constraint(table_name)
     
-    def _create_unique_constraint(self, table_name: str):
-        try:
-            full_name = f"{self.config.schema}.{table_name}"
-            with self.engine.connect() as conn:
-                check_constraint = text(f"""
+    def _ensure_load_default(self, table_name: str):
+        """
+        Make the database stamp fecha_carga on tables created without a default.
+        
+        SQL Server gets a DEFAULT constraint. SQLite cannot add a default to an
+        existing column, so a trigger fills fecha_carga when an insert omits it.
+        """
+        with self.engine.begin() as conn:
+            if self.config.db_type == 'sqlserver':
+                full_name = f"{self.config.schema}.{table_name}"
+                conn.execute(text(f"""
                     IF NOT EXISTS (
                         SELECT 1
-                        FROM sys.indexes
-                        WHERE name = 'UQ_{table_name}_numero_operacion'
-                        AND object_id = OBJECT_ID('{full_name}')
+                        FROM sys.default_constraints
+                        WHERE parent_object_id = OBJECT_ID('{full_name}')
+                        AND parent_column_id = COLUMNPROPERTY(OBJECT_ID('{full_name}'), 'fecha_carga', 'ColumnId')
                     )
                     BEGIN
-                        CREATE UNIQUE INDEX UQ_{table_name}_numero_operacion
-                        ON {full_name}(numero_operacion);
+                        ALTER TABLE {full_name}
+                        ADD CONSTRAINT DF_{table_name}_fecha_carga DEFAULT CURRENT_TIMESTAMP FOR fecha_carga;
                     END
-                """)
-                conn.execute(check_constraint)
-                conn.commit()
-        except Exception as e:
-            print(f"Note: Unique constraint may already exist: {e}")
-
+                """))
+                return
+            
+            load_default = {
+                row[1]: row[4] for row in conn.execute(text(f"PRAGMA table_info({table_name})"))
+            }.get('fecha_carga')
+            if load_default is None:
+                conn.execute(text(f"""
+                    CREATE TRIGGER IF NOT EXISTS trg_{table_name}_fecha_carga
+                    AFTER INSERT ON {table_name}
+                    FOR EACH ROW WHEN NEW.fecha_carga IS NULL
+                    BEGIN
+                        UPDATE {table_name} SET fecha_carga = datetime('now', 'localtime')
+                        WHERE id = NEW.id;
+                    END
+                """))
+    
+    def _create_unique_constraint(self, table_name: str):
+        """
+        Create the unique index on numero_operacion that the upserts rely on.
+        
+        Raises:
+            RuntimeError: If the table already holds repeated operation IDs,
+                which would make the index creation fail
+        """
+        index_name = f"UQ_{table_name}_numero_operacion"
+        
+        if self.config.db_type == 'sqlserver':
+            target = f"{self.config.schema}.{table_name}"
+            exists = (
+                f"SELECT 1 FROM sys.indexes "
+                f"WHERE name = '{index_name}' AND object_id = OBJECT_ID('{target}')"
+            )
+        else:
+            target = table_name
+            exists = f"SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = '{index_name}'"
+        
+        with self.engine.begin() as conn:
+            if conn.execute(text(exists)).first() is not None:
+                return
+            
+            # ON CONFLICT / MERGE requieren la clave única; con duplicados el
+            # índice no se puede crear y la carga fallaría después
+            repeated = conn.execute(text(f"""
+                SELECT COUNT(*) FROM (
+                    SELECT numero_operacion FROM {target}
+                    GROUP BY numero_operacion HAVING COUNT(*) > 1
+                ) AS repeated
+            """)).scalar_one()
+            if repeated:
+                raise RuntimeError(
+                    f"Cannot create unique index {index_name}: {repeated} "
+                    f"numero_operacion values appear more than once in {target}. "
+                    f"Remove the duplicate rows before loading."
+                )
+            
+            conn.execute(text(f"CREATE UNIQUE INDEX {index_name} ON {target}(numero_operacion)"))
     
     def upsert_data(
         self,
@@ -204,12 +334,8 @@ class SQLLoader:
         }
         
         try:
-            if self.config.db_type == 'sqlite':
-                self._upsert_sqlite(df, table_name, conflict_columns)
-            elif self.config.db_type == 'sqlserver':
-                self._upsert_sqlserver(df, table_name, conflict_columns)
-            else:
-                raise ValueError(f"Unsupported database type: {self.config.db_type}")
+            with self.engine.begin() as conn:
+                self._upsert(self._prepare_frame(df), table_name, conflict_columns, conn)
             
         except Exception as e:
             self.load_stats['rows_failed'] = len(df)
@@ -217,232 +343,324 @@ class SQLLoader:
         
         return self.load_stats.copy()
     
+    def bulk_load(
+        self,
+        df: pd.DataFrame,
+        table_name: str = 'operaciones',
+        chunksize: int = 10_000
+    ) -> Dict:
+        """
+        Bulk insert into an empty table in a single transaction.
+        
+        Rows are sent in batches through the driver's executemany path
+        (fast_executemany on SQL Server). Falls back to an upsert on the
+        same connection when the table already contains rows, since bulk
+        insert cannot resolve conflicts.
+        """
+        if self.engine is None:
+            self.connect()
+        
+        if self.config.db_type == 'sqlserver':
+            target = f"{self.config.schema}.{table_name}"
+            probe = f"SELECT TOP 1 1 FROM {target}"
+        else:
+            probe = f"SELECT 1 FROM {table_name} LIMIT 1"
+        
+        self.load_stats = {
+            'rows_inserted': 0,
+            'rows_updated': 0,
+            'rows_failed': 0,
+            'total_processed': len(df)
+        }
+        
+        schema = self.config.schema if self.config.db_type == 'sqlserver' else None
+        bulk_inserted = False
+        
+        df_copy = self._prepare_frame(df)
+        
+        try:
+            with self.engine.begin() as conn:
+                if conn.execute(text(probe)).first() is not None:
+                    self._upsert(df_copy, table_name, ['numero_operacion'], conn)
+                else:
+                    # fecha_carga la asigna el motor (default de la columna), no se envía
+                    df_copy = df_copy.drop(columns=['fecha_carga'], errors='ignore')
+                    # Claves repetidas en el lote romperían el índice único; como
+                    # en el upsert de SQLite, gana la última aparición
+                    df_copy = df_copy.drop_duplicates(subset=['numero_operacion'], keep='last')
+                    
+                    df_copy.to_sql(
+                        table_name,
+                        con=conn,
+                        schema=schema,
+                        if_exists='append',
+                        index=False,
+                        chunksize=chunksize
+                    )
+                    bulk_inserted = True
+        except Exception as e:
+            self.load_stats['rows_failed'] = len(df)
+            raise RuntimeError(f"Failed to load data: {str(e)}")
+        
+        if bulk_inserted:
+            self.load_stats['rows_inserted'] = len(df_copy)
+        
+        return self.load_stats.copy()
+    
+    def _prepare_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Convert dates and apply the column length limits before any load path."""
+        df_copy = df.copy(deep=False)
+        # Conversión de fechas una sola vez, vectorizada, para toda la columna
+        df_copy['fecha_operacion'] = pd.to_datetime(df_copy['fecha_operacion'])
+        
+        # Truncar campos de texto a la longitud de las columnas VARCHAR
+        if self.config.db_type == 'sqlserver':
+            for col, (nullable, max_len) in TEXT_LIMITS.items():
+                df_copy[col] = self._truncate_text(df_copy[col], max_len, nullable)
+        
+        return df_copy
+    
+    def _upsert(self, df: pd.DataFrame, table_name: str, conflict_columns: List[str], conn):
+        """Dispatch the UPSERT to the dialect-specific implementation on conn."""
+        if self.config.db_type == 'sqlite':
+            self._upsert_sqlite(df, table_name, conflict_columns, conn)
+        elif self.config.db_type == 'sqlserver':
+            self._upsert_sqlserver(df, table_name, conflict_columns, conn)
+        else:
+            raise ValueError(f"Unsupported database type: {self.config.db_type}")
+    
     def _upsert_sqlite(
         self,
         df: pd.DataFrame,
         table_name: str,
-        conflict_columns: List[str]
+        conflict_columns: List[str],
+        conn
     ):
-        """SQLite UPSERT using replace method."""
-        df_copy = df.copy()
-        df_copy['fecha_carga'] = pd.Timestamp.now()
+        """SQLite UPSERT via a staging table and INSERT ... ON CONFLICT DO UPDATE."""
+        temp_table = f"tmp_{table_name}"
+        conflict_target = ", ".join(conflict_columns)
         
-        try:
-            existing_df = pd.read_sql(f"SELECT numero_operacion FROM {table_name}", self.engine)
-            existing_ids = set(existing_df['numero_operacion'].tolist())
-        except:
-            existing_ids = set()
-        
-        new_rows = df_copy[~df_copy['numero_operacion'].isin(existing_ids)]
-        update_rows = df_copy[df_copy['numero_operacion'].isin(existing_ids)]
-        
-        if len(new_rows) > 0:
-            new_rows.to_sql(table_name, self.engine, if_exists='append', index=False)
-            self.load_stats['rows_inserted'] = len(new_rows)
-        
-        if len(update_rows) > 0:
-            for _, row in update_rows.iterrows():
-                fecha_op = pd.to_datetime(row['fecha_operacion']).to_pydatetime() if pd.notna(row['fecha_operacion']) else None
-                fecha_carga = pd.to_datetime(row['fecha_carga']).to_pydatetime() if pd.notna(row['fecha_carga']) else None
-
-                update_sql = text("""
-                UPDATE operaciones
-                SET fecha_operacion = :fecha_op,
-                    tipo_operacion = :tipo_op,
-                    monto = :monto,
-                    moneda = :moneda,
-                    cuenta_origen = :cta_orig,
-                    cuenta_destino = :cta_dest,
-                    banco_origen = :banco_orig,
-                    banco_destino = :banco_dest,
-                    descripcion = :desc,
-                    estado = :estado,
-                    canal = :canal,
-                    content_hash = :hash,
-                    fecha_carga = :fecha_carga
-                WHERE numero_operacion = :num_op
-                """)
-
-                with self.engine.connect() as conn:
-                    conn.execute(update_sql, {
-                        'fecha_op': fecha_op,
-                        'tipo_op': row['tipo_operacion'],
-                        'monto': float(row['monto']) if pd.notna(row['monto']) else None,
-                        'moneda': row['moneda'],
-                        'cta_orig': row['cuenta_origen'],
-                        'cta_dest': row['cuenta_destino'],
-                        'banco_orig': row['banco_origen'],
-                        'banco_dest': row['banco_destino'],
-                        'desc': row['descripcion'],
-                        'estado': row['estado'],
-                        'canal': row['canal'],
-                        'hash': row['content_hash'],
-                        'fecha_carga': fecha_carga,
-                        'num_op': row['numero_operacion']
-                    })
-                    conn.commit()
-                        
-            self.load_stats['rows_updated'] = len(update_rows)
-    
-    def _upsert_sqlserver(self, df: pd.DataFrame, table_name: str, conflict_columns: List[str]):
-        from sqlalchemy import VARCHAR, FLOAT, DATETIME
+        table_columns = {
+            row[1] for row in conn.execute(text(f"PRAGMA table_info({table_name})"))
+        }
+        # fecha_carga la asigna el motor en hora local, no se envía
+        columns = [
+            c for c in df.columns
+            if c in table_columns and c not in ('id', 'fecha_carga')
+        ]
         
-        df_copy = df.copy()
+        df[columns].to_sql(
+            temp_table,
+            conn,
+            if_exists='replace',
+            index=False,
+            method='multi',
+            chunksize=500
+        )
         
-        # Asegurar tipos correctos
-        df_copy['fecha_operacion'] = pd.to_datetime(df_copy['fecha_operacion'])
-        df_copy['fecha_carga'] = pd.Timestamp.now()
+        match = " AND ".join(f"t.{c} = s.{c}" for c in conflict_columns)
+        updated = conn.execute(text(f"""
+            SELECT COUNT(*) FROM {temp_table} s
+            WHERE EXISTS (SELECT 1 FROM {table_name} t WHERE {match})
+        """)).scalar_one()
         
-        # Truncar campos de texto
-        df_copy['descripcion'] = df_copy['descripcion'].astype(str).str[:500]
-        df_copy['banco_origen'] = df_copy['banco_origen'].astype(str).str[:50]
-        df_copy['banco_destino'] = df_copy['banco_destino'].fillna('').astype(str).str[:50]
-        df_copy['cuenta_origen'] = df_copy['cuenta_origen'].astype(str).str[:50]
-        df_copy['cuenta_destino'] = df_copy['cuenta_destino'].fillna('').astype(str).str[:50]
+        column_list = ", ".join(columns)
+        assignments = ",\n                ".join(
+            [f"{c} = excluded.{c}" for c in columns if c not in conflict_columns]
+            + ["fecha_carga = datetime('now', 'localtime')"]
+        )
         
-        # Reemplazar vacíos con None
-        df_copy['cuenta_destino'] = df_copy['cuenta_destino'].replace('', None)
-        df_copy['banco_destino'] = df_copy['banco_destino'].replace('', None)
+        conn.execute(text(f"""
+            INSERT INTO {table_name} ({column_list}, fecha_carga)
+            SELECT {column_list}, datetime('now', 'localtime') FROM {temp_table} WHERE true
+            ON CONFLICT({conflict_target}) DO UPDATE SET
+                {assignments}
+        """))
+        
+        conn.execute(text(f"DROP TABLE IF EXISTS {temp_table}"))
+        
+        self.load_stats['rows_updated'] = int(updated)
+        self.load_stats['rows_inserted'] = len(df) - int(updated)
+    
+    def _upsert_sqlserver(self, df: pd.DataFrame, table_name: str, conflict_columns: List[str], conn):
+        df_copy = df[list(STAGE_DTYPES)]
         
         full_target = f"{self.config.schema}.{table_name}"
-        temp_table = f"temp_operaciones_{pd.Timestamp.now().strftime('%Y%m%d%H%M%S')}"
         
-        with self.engine.begin() as conn:
-            # Usar to_sql directamente con tipos específicos
-            df_copy.to_sql(
-                temp_table,
+        # Tabla temporal local (#) como heap sin índices: registro mínimo en tempdb
+        stage_columns = ",\n                ".join(
+            f"{col} {col_type.compile(dialect=conn.dialect)}"
+            for col, col_type in STAGE_DTYPES.items()
+        )
+        conn.execute(text("IF OBJECT_ID('tempdb..#stage') IS NOT NULL DROP TABLE #stage"))
+        conn.execute(text(f"""
+        CREATE TABLE #stage (
+            {stage_columns}
+        )
+        """))
+        
+        # Cargar la tabla temporal por bloques para no materializar todo el frame
+        for start in range(0, len(df_copy), STAGE_CHUNK_ROWS):
+            df_copy.iloc[start:start + STAGE_CHUNK_ROWS].to_sql(
+                '#stage',
                 con=conn,
-                if_exists='replace',
+                if_exists='append',
                 index=False,
-                schema=self.config.schema,
-                dtype={
-                    'fecha_operacion': DATETIME,
-                    'numero_operacion': VARCHAR(20),
-                    'tipo_operacion': VARCHAR(20),
-                    'monto': FLOAT,
-                    'moneda': VARCHAR(3),
-                    'cuenta_origen': VARCHAR(50),
-                    'cuenta_destino': VARCHAR(50),
-                    'banco_origen': VARCHAR(50),
-                    'banco_destino': VARCHAR(50),
-                    'descripcion': VARCHAR(500),
-                    'estado': VARCHAR(20),
-                    'canal': VARCHAR(20),
-                    'content_hash': VARCHAR(32),
-                    'fecha_carga': DATETIME
-                }
+                method=None,
+                chunksize=1000
             )
-            
-            source_table = f"{self.config.schema}.{temp_table}"
-            
-            merge_sql = text(f"""
-            MERGE {full_target} AS target
-            USING {source_table} AS source
-            ON target.numero_operacion = source.numero_operacion
-            WHEN MATCHED THEN
-                UPDATE SET 
-                    target.fecha_operacion = source.fecha_operacion,
-                    target.tipo_operacion = source.tipo_operacion,
-                    target.monto = source.monto,
-                    target.moneda = source.moneda,
-                    target.cuenta_origen = source.cuenta_origen,
-                    target.cuenta_destino = source.cuenta_destino,
-                    target.banco_origen = source.banco_origen,
-                    target.banco_destino = source.banco_destino,
-                    target.descripcion = source.descripcion,
-                    target.estado = source.estado,
-                    target.canal = source.canal,
-                    target.content_hash = source.content_hash,
-                    target.fecha_carga = source.fecha_carga
-            WHEN NOT MATCHED THEN
-                INSERT (fecha_operacion, numero_operacion, tipo_operacion, monto, moneda,
-                        cuenta_origen, cuenta_destino, banco_origen, banco_destino,
-                        descripcion, estado, canal, content_hash, fecha_carga)
-                VALUES (source.fecha_operacion, source.numero_operacion, source.tipo_operacion,
-                        source.monto, source.moneda, source.cuenta_origen, source.cuenta_destino,
-                        source.banco_origen, source.banco_destino, source.descripcion,
-                        source.estado, source.canal, source.content_hash, source.fecha_carga);
-            """)
-            
-            conn.execute(merge_sql)
-            
-            drop_temp = text(f"DROP TABLE IF EXISTS {source_table};")
-            conn.execute(drop_temp)
+        
+        merge_sql = text(f"""
+        MERGE {full_target} AS target
+        USING #stage AS source WITH (TABLOCK)
+        ON target.numero_operacion = source.numero_operacion
+        WHEN MATCHED THEN
+            UPDATE SET 
+                target.fecha_operacion = source.fecha_operacion,
+                target.tipo_operacion = source.tipo_operacion,
+                target.monto = source.monto,
+                target.moneda = source.moneda,
+                target.cuenta_origen = source.cuenta_origen,
+                target.cuenta_destino = source.cuenta_destino,
+                target.banco_origen = source.banco_origen,
+                target.banco_destino = source.banco_destino,
+                target.descripcion = source.descripcion,
+                target.estado = source.estado,
+                target.canal = source.canal,
+                target.content_hash = source.content_hash,
+                target.fecha_carga = CURRENT_TIMESTAMP
+        WHEN NOT MATCHED THEN
+            INSERT (fecha_operacion, numero_operacion, tipo_operacion, monto, moneda,
+                    cuenta_origen, cuenta_destino, banco_origen, banco_destino,
+                    descripcion, estado, canal, content_hash, fecha_carga)
+            VALUES (source.fecha_operacion, source.numero_operacion, source.tipo_operacion,
+                    source.monto, source.moneda, source.cuenta_origen, source.cuenta_destino,
+                    source.banco_origen, source.banco_destino, source.descripcion,
+                    source.estado, source.canal, source.content_hash, CURRENT_TIMESTAMP);
+        """)
+        
+        conn.execute(merge_sql)
+        
+        # La conexión vuelve al pool con la sesión abierta: eliminar #stage
+        conn.execute(text("DROP TABLE #stage"))
         
         self.load_stats['rows_inserted'] = len(df)
 
     
+    @staticmethod
+    def _truncate_text(series: pd.Series, max_len: int, nullable: bool) -> pd.Series:
+        """Truncate a text column to max_len characters, keeping nulls if nullable."""
+        if not nullable:
+            series = series.astype(object).fillna('')
+        
+        if pa is None:
+            truncated = series.astype(object).where(series.isna(), series.astype(str).str[:max_len])
+        else:
+            values = pa.array(series.astype('string[pyarrow]').array)
+            truncated = pd.Series(
+                pd.array(pc.utf8_slice_codeunits(values, 0, max_len), dtype='string[pyarrow]'),
+                index=series.index
+            )
+        
+        # Cadenas vacías en columnas opcionales se cargan como NULL
+        return truncated.replace('', None) if nullable else truncated
+    
     def query_data(
         self,
         table_name: str = 'operaciones',
         filters: Optional[Dict] = None,
-        limit: Optional[int] = None
+        limit: Optional[int] = None,
+        chunksize: int = 50_000
     ) -> pd.DataFrame:
-        """Query data from database."""
+        """Query data from database using bound parameters and a streamed cursor."""
+        chunks = list(self.iter_query_data(table_name, filters, limit, chunksize))
+        return pd.concat(chunks, ignore_index=True)
+    
+    def iter_query_data(
+        self,
+        table_name: str = 'operaciones',
+        filters: Optional[Dict] = None,
+        limit: Optional[int] = None,
+        chunksize: int = 50_000
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Yield query results in DataFrame chunks.
+        
+        Uses a server-side cursor (stream_results) so only one chunk
+        is held in memory at a time.
+        """
         if self.engine is None:
             self.connect()
         
-        query = f"SELECT * FROM {table_name}"
+        columns = self._get_columns(table_name)
+        conditions = []
+        params = {}
         
-        if filters:
-            conditions = []
-            for col, val in filters.items():
-                if isinstance(val, str):
-                    conditions.append(f"{col} = '{val}'")
-                else:
-                    conditions.append(f"{col} = {val}")
+        for i, (col, val) in enumerate((filters or {}).items()):
+            if col not in columns:
+                raise ValueError(f"Unknown column in filters: {col}")
+            conditions.append(f"{col} = :p{i}")
+            params[f"p{i}"] = val
+        
+        top = "TOP (:limit) " if limit and self.config.db_type == 'sqlserver' else ""
+        query = f"SELECT {top}* FROM {table_name}"
+        
+        if conditions:
             query += " WHERE " + " AND ".join(conditions)
         
         if limit:
-            if self.config.db_type == 'sqlserver':
-                query = f"SELECT TOP {limit} * FROM {table_name}"
-                if filters:
-                    conditions = [f"{col} = '{val}'" if isinstance(val, str) else f"{col} = {val}" 
-                                  for col, val in filters.items()]
-                    query += " WHERE " + " AND ".join(conditions)
-            else:
-                query += f" LIMIT {limit}"
-        
-        return pd.read_sql(query, self.engine)
+            params['limit'] = int(limit)
+            if self.config.db_type != 'sqlserver':
+                query += " LIMIT :limit"
+        
+        with self.engine.connect().execution_options(stream_results=True) as conn:
+            yield from pd.read_sql(text(query), conn, params=params, chunksize=chunksize)
+    
+    def _get_columns(self, table_name: str) -> set:
+        """Return (and cache) the column names of a table, used to whitelist filters."""
+        if table_name not in self._columns_cache:
+            schema = self.config.schema if self.config.db_type == 'sqlserver' else None
+            self._columns_cache[table_name] = {
+                col['name'] for col in inspect(self.engine).get_columns(table_name, schema=schema)
+            }
+        return self._columns_cache[table_name]
     
     def get_table_stats(self, table_name: str = 'operaciones') -> Dict:
         """Get statistics about table contents."""
         if self.engine is None:
             self.connect()
         
-        stats = {}
-        
-        count_query = f"SELECT COUNT(*) as total FROM {table_name}"
-        stats['total_rows'] = pd.read_sql(count_query, self.engine)['total'].iloc[0]
-        
-        date_query = f"""
+        query = text(f"""
         SELECT 
+            COUNT(*) as total,
             MIN(fecha_operacion) as min_date, 
-            MAX(fecha_operacion) as max_date 
-        FROM {table_name}
-        """
-        date_stats = pd.read_sql(date_query, self.engine)
-        stats['date_range'] = {
-            'min': date_stats['min_date'].iloc[0],
-            'max': date_stats['max_date'].iloc[0]
-        }
-        
-        amount_query = f"""
-        SELECT 
+            MAX(fecha_operacion) as max_date,
             SUM(monto) as total_amount, 
             AVG(monto) as avg_amount 
         FROM {table_name}
-        """
-        amount_stats = pd.read_sql(amount_query, self.engine)
-        stats['amounts'] = {
-            'total': float(amount_stats['total_amount'].iloc[0]),
-            'average': float(amount_stats['avg_amount'].iloc[0])
-        }
+        """)
         
-        return stats
+        with self.engine.connect() as conn:
+            row = conn.execute(query).one()
+        
+        return {
+            'total_rows': row.total,
+            'date_range': {
+                'min': row.min_date,
+                'max': row.max_date
+            },
+            'amounts': {
+                'total': float(row.total_amount or 0),
+                'average': float(row.avg_amount or 0)
+            }
+        }
     
     def close(self):
         """Close database connection."""
         if self.engine:
+            if self.config.db_type == 'sqlite':
+                # Refrescar estadísticas del planificador antes de cerrar
+                with self.engine.connect() as conn:
+                    conn.execute(text("PRAGMA optimize"))
             self.engine.dispose()
             print("Database connection closed")
\ No newline at end of file
@@ -8,9 +8,22 @@ from datetime import datetime
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.chart import BarChart, PieChart, Reference
+from openpyxl.utils import get_column_letter
 from openpyxl.utils.dataframe import dataframe_to_rows
 
 
+# Estilos compartidos (se crean una sola vez por proceso)
+_HEADER_FILL = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+_HEADER_FONT = Font(bold=True, color="FFFFFF", size=12)
+_TITLE_FONT = Font(bold=True, size=16, color="366092")
+_SUCCESS_FILL = PatternFill(start_color="00C851", fill_type="solid")
+_FAILURE_FILL = PatternFill(start_color="FF4444", fill_type="solid")
+_BOLD_WHITE_FONT = Font(bold=True, color="FFFFFF")
+_LABEL_FONT = Font(bold=True)
+_CENTER = Alignment(horizontal='center')
+_SECTION_FONT = Font(bold=True, size=14)
+
+
 class ExcelReportGenerator:
     """Generates professional Excel reports for ETL pipeline results."""
     
@@ -56,11 +69,8 @@ class ExcelReportGenerator:
         
         ws = wb.create_sheet('Resumen Ejecutivo', 0)
         
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF", size=12)
-        
         ws['A1'] = 'REPORTE ETL - CONCILIACIÓN OPERATIVA'
-        ws['A1'].font = Font(bold=True, size=16, color="366092")
+        ws['A1'].font = _TITLE_FONT
         ws.merge_cells('A1:D1')
         
         ws['A3'] = 'Pipeline ID:'
@@ -71,16 +81,12 @@ class ExcelReportGenerator:
         
         ws['A5'] = 'Estado:'
         ws['B5'] = metrics.get('status', 'N/A').upper()
-        status_fill = PatternFill(
-            start_color="00C851" if metrics.get('status') == 'success' else "FF4444",
-            fill_type="solid"
-        )
-        ws['B5'].fill = status_fill
-        ws['B5'].font = Font(bold=True, color="FFFFFF")
+        ws['B5'].fill = _SUCCESS_FILL if metrics.get('status') == 'success' else _FAILURE_FILL
+        ws['B5'].font = _BOLD_WHITE_FONT
         
         ws['A7'] = 'MÉTRICAS CLAVE'
-        ws['A7'].font = header_font
-        ws['A7'].fill = header_fill
+        ws['A7'].font = _HEADER_FONT
+        ws['A7'].fill = _HEADER_FILL
         ws.merge_cells('A7:D7')
         
         row = 8
@@ -97,7 +103,7 @@ class ExcelReportGenerator:
         for label, value in summary_data:
             ws[f'A{row}'] = label
             ws[f'B{row}'] = value
-            ws[f'A{row}'].font = Font(bold=True)
+            ws[f'A{row}'].font = _LABEL_FONT
             row += 1
         
         for col in ['A', 'B', 'C', 'D']:
@@ -107,35 +113,32 @@ class ExcelReportGenerator:
         """Create data sample sheet."""
         ws = wb.create_sheet('Muestra de Datos')
         
-        for r in dataframe_to_rows(data_sample.head(100), index=False, header=True):
-            ws.append(r)
+        sample = data_sample.head(100)
         
-        header_fill = PatternFill(start_color="366092", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF")
+        # Anchos estimados con las primeras filas: es solo un ajuste visual
+        width_sample = sample.head(20)
+        widths = [
+            max(len(str(col)), int(width_sample.iloc[:, i].astype(str).str.len().max()) if len(width_sample) else 0)
+            for i, col in enumerate(width_sample.columns)
+        ]
+        
+        for r in dataframe_to_rows(sample, index=False, header=True):
+            ws.append(r)
         
         for cell in ws[1]:
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal='center')
-        
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(cell.value)
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
+            cell.fill = _HEADER_FILL
+            cell.font = _BOLD_WHITE_FONT
+            cell.alignment = _CENTER
+        
+        for i, width in enumerate(widths, 1):
+            ws.column_dimensions[get_column_letter(i)].width = min(width + 2, 50)
     
     def _create_metrics_sheet(self, wb: Workbook, metrics: dict):
         """Create detailed metrics sheet with charts."""
         ws = wb.create_sheet('Métricas Detalladas')
         
         ws['A1'] = 'ANÁLISIS DE PROCESAMIENTO'
-        ws['A1'].font = Font(bold=True, size=14)
+        ws['A1'].font = _SECTION_FONT
         
         ws['A3'] = 'Distribución de Registros'
         
@@ -0,0 +1,80 @@
+"""
+Content-addressed cache for pipeline stage outputs.
+Stores stage DataFrames as Parquet plus a JSON sidecar with stage metadata.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def file_digest(filepath: str) -> str:
+    """
+    Compute a BLAKE2b digest of a file's contents.
+    
+    Args:
+        filepath: Path to the file
+    
+    Returns:
+        32-character hex digest
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _json_default(obj):
+    """Serialize numpy scalars natively and anything else as text."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return str(obj)
+
+
+class StageCache:
+    """Caches stage results on disk keyed by input content and stage version."""
+    
+    def __init__(self, root_dir: str = "data/cache"):
+        self.root_dir = Path(root_dir)
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+    
+    def get_or_compute(
+        self,
+        key: str,
+        compute_fn: Callable[[], Tuple[pd.DataFrame, Dict]]
+    ) -> Tuple[pd.DataFrame, Dict]:
+        """
+        Return the cached result for key, computing and storing it on a miss.
+        
+        Args:
+            key: Cache key (content digest plus stage version)
+            compute_fn: Function returning (DataFrame, JSON-serializable metadata)
+        
+        Returns:
+            Tuple of (DataFrame, metadata)
+        """
+        data_path = self.root_dir / f"{key}.parquet"
+        meta_path = self.root_dir / f"{key}.json"
+        
+        if data_path.exists() and meta_path.exists():
+            self.hits += 1
+            df = pd.read_parquet(data_path, engine='pyarrow')
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            return df, meta
+        
+        self.misses += 1
+        df, meta = compute_fn()
+        
+        df.to_parquet(data_path, index=False, engine='pyarrow')
+        with open(meta_path, 'w') as f:
+            json.dump(meta, f, default=_json_default)
+        
+        return df, meta
@@ -8,6 +8,7 @@ import structlog
 from pathlib import Path
 from datetime import datetime
 import sys
+from functools import lru_cache
 
 
 def setup_logging(
@@ -78,6 +79,7 @@ def setup_logging(
         root_logger.addHandler(file_handler)
 
 
+@lru_cache(maxsize=None)
 def get_logger(name: str):
     """
     Get a configured logger instance.
@@ -86,6 +88,6 @@ def get_logger(name: str):
         name: Logger name (typically __name__)
     
     Returns:
-        Configured structlog logger
+        Configured structlog logger (the same instance for repeated names)
     """
     return structlog.get_logger(name)
\ No newline at end of file
@@ -5,11 +5,53 @@ Records performance metrics and statistics.
 
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import json
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import numpy as np
 import pandas as pd
 
+try:
+    import orjson
+except ImportError:  # orjson is optional: falls back to the stdlib json module
+    orjson = None
+
+
+def _json_default(obj):
+    """Serialize numpy scalars/arrays natively and anything else as text."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    return str(obj)
+
+
+# Resumen por corrida (una fila por archivo JSON) para las estadísticas agregadas
+SUMMARY_INDEX_FILE = "metrics_index.parquet"
+_SUMMARY_COLUMNS = [
+    'file', 'mtime_ns', 'status', 'input_rows', 'rows_loaded',
+    'processing_time_seconds', 'start_time'
+]
+
+# Below this size mapping the file costs more than the copy it saves
+_MMAP_MIN_BYTES = 4096
+
+
+def _read_json(filepath: Path) -> Dict:
+    """Read a JSON file, using orjson (on a memory map for larger files) when available."""
+    if orjson is not None:
+        with open(filepath, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < _MMAP_MIN_BYTES:
+                return orjson.loads(f.read())
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                return orjson.loads(view)
+    with open(filepath, 'r') as f:
+        return json.load(f)
+
+
 @dataclass
 class PipelineMetrics:
     """Container for pipeline execution metrics."""
@@ -32,6 +74,8 @@ class PipelineMetrics:
     rows_updated: int = 0
     load_failed: int = 0
     
+    cache_hits: int = 0
+    
     processing_time_seconds: float = 0.0
     status: str = "running"
     error_message: str = ""
@@ -59,29 +103,17 @@ class PipelineMetrics:
         filename = f"metrics_{self.pipeline_id}.json"
         filepath = output_path / filename
         
-        def convert_types(obj):
-            """Convert numpy/pandas types to Python native types."""
-            import numpy as np
-            if isinstance(obj, (np.integer, np.int64)):
-                return int(obj)
-            elif isinstance(obj, (np.floating, np.float64)):
-                return float(obj)
-            elif isinstance(obj, np.ndarray):
-                return obj.tolist()
-            elif pd.isna(obj):
-                return None
-            return obj
-        
         data = self.to_dict()
         
-        # Convert all numeric types
-        for key, value in data.items():
-            if isinstance(value, (list, dict)):
-                continue
-            data[key] = convert_types(value)
-        
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2, default=str)
+        if orjson is not None:
+            filepath.write_bytes(orjson.dumps(
+                data,
+                default=_json_default,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+            ))
+        else:
+            with open(filepath, 'w') as f:
+                json.dump(data, f, indent=2, default=_json_default)
         
         return filepath
     
@@ -109,6 +141,8 @@ class MetricsCollector:
     def __init__(self, storage_dir: str = "data/output/metrics"):
         self.storage_dir = Path(storage_dir)
         self.storage_dir.mkdir(parents=True, exist_ok=True)
+        # filepath -> (st_mtime_ns, metrics); invalidated when the file changes
+        self._cache: Dict[Path, Tuple[int, PipelineMetrics]] = {}
     
     def load_metrics(self, pipeline_id: str) -> Optional[PipelineMetrics]:
         """Load metrics for a specific pipeline run."""
@@ -117,50 +151,129 @@ class MetricsCollector:
         if not filepath.exists():
             return None
         
-        with open(filepath, 'r') as f:
-            data = json.load(f)
+        return self._hydrate(_read_json(filepath))
+    
+    def get_all_metrics(self) -> List[PipelineMetrics]:
+        """Load all stored metrics, reading changed files in parallel."""
+        paths = list(self.storage_dir.glob("metrics_*.json"))
         
+        if not paths:
+            self._cache.clear()
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(32, len(paths))) as executor:
+            metrics_list = list(executor.map(self._load_one, paths))
+        
+        # Descartar entradas de archivos eliminados
+        for stale in self._cache.keys() - set(paths):
+            del self._cache[stale]
+        
+        return sorted(metrics_list, key=lambda m: m.start_time, reverse=True)
+    
+    def _load_one(self, filepath: Path) -> PipelineMetrics:
+        """Load a single metrics file, reusing the cached copy if unchanged."""
+        mtime = filepath.stat().st_mtime_ns
+        cached = self._cache.get(filepath)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        
+        metrics = self._hydrate(_read_json(filepath))
+        self._cache[filepath] = (mtime, metrics)
+        return metrics
+    
+    @staticmethod
+    def _hydrate(data: Dict) -> PipelineMetrics:
+        """Build PipelineMetrics from its stored JSON representation."""
         data['start_time'] = datetime.fromisoformat(data['start_time'])
         if data.get('end_time'):
             data['end_time'] = datetime.fromisoformat(data['end_time'])
         
         return PipelineMetrics(**data)
     
-    def get_all_metrics(self) -> List[PipelineMetrics]:
-        """Load all stored metrics."""
-        metrics_list = []
-        
-        for filepath in self.storage_dir.glob("metrics_*.json"):
-            with open(filepath, 'r') as f:
-                data = json.load(f)
-            
-            data['start_time'] = datetime.fromisoformat(data['start_time'])
-            if data.get('end_time'):
-                data['end_time'] = datetime.fromisoformat(data['end_time'])
-            
-            metrics_list.append(PipelineMetrics(**data))
+    def _summary_index(self) -> pd.DataFrame:
+        """
+        Return one summary row per stored run, from the Parquet index.
         
-        return sorted(metrics_list, key=lambda m: m.start_time, reverse=True)
+        The index only re-reads JSON files that are new or changed since it
+        was last written, so aggregating over many runs is a single columnar
+        read instead of one file open per run.
+        """
+        index_path = self.storage_dir / SUMMARY_INDEX_FILE
+        mtimes = {
+            path.name: path.stat().st_mtime_ns
+            for path in self.storage_dir.glob("metrics_*.json")
+        }
+        
+        index = self._read_summary_index(index_path)
+        if index is None:
+            # Sin índice o ilegible: se reconstruye desde los JSON
+            index = current = pd.DataFrame(columns=_SUMMARY_COLUMNS)
+        else:
+            fresh = index['file'].map(mtimes).eq(index['mtime_ns'])
+            current = index[fresh]
+        
+        pending = mtimes.keys() - set(current['file'])
+        if not pending and len(current) == len(index) and index_path.exists():
+            return current
+        
+        if pending:
+            new_rows = pd.DataFrame(
+                [self._summary_row(name, mtimes[name]) for name in sorted(pending)],
+                columns=_SUMMARY_COLUMNS
+            )
+            index = new_rows if current.empty else pd.concat([current, new_rows], ignore_index=True)
+        else:
+            index = current.reset_index(drop=True)
+        
+        # Escritura atómica: un lector nunca ve un índice a medio escribir
+        tmp_path = index_path.with_name(f"{SUMMARY_INDEX_FILE}.{os.getpid()}.tmp")
+        index.to_parquet(tmp_path, index=False, engine='pyarrow')
+        os.replace(tmp_path, index_path)
+        
+        return index
+    
+    @staticmethod
+    def _read_summary_index(index_path: Path) -> Optional[pd.DataFrame]:
+        """Read the summary index, or None if it is missing, corrupt or outdated."""
+        if not index_path.exists():
+            return None
+        try:
+            index = pd.read_parquet(index_path, engine='pyarrow')
+        except (OSError, ValueError):
+            return None
+        if list(index.columns) != _SUMMARY_COLUMNS:
+            return None
+        return index
+    
+    def _summary_row(self, filename: str, mtime_ns: int) -> Tuple:
+        """Summary fields of one stored run, in _SUMMARY_COLUMNS order."""
+        data = _read_json(self.storage_dir / filename)
+        return (
+            filename,
+            mtime_ns,
+            data.get('status'),
+            data.get('input_rows', 0),
+            data.get('rows_loaded', 0),
+            data.get('processing_time_seconds', 0.0),
+            data['start_time']
+        )
     
     def get_aggregated_stats(self) -> Dict:
         """Get aggregated statistics across all runs."""
-        all_metrics = self.get_all_metrics()
+        index = self._summary_index()
         
-        if not all_metrics:
+        total_runs = len(index)
+        if not total_runs:
             return {}
         
-        total_runs = len(all_metrics)
-        successful_runs = sum(1 for m in all_metrics if m.status == "success")
-        total_rows_processed = sum(m.input_rows for m in all_metrics)
-        total_rows_loaded = sum(m.rows_loaded for m in all_metrics)
-        avg_processing_time = sum(m.processing_time_seconds for m in all_metrics) / total_runs
+        successful_runs = int((index['status'] == "success").sum())
         
         return {
             'total_runs': total_runs,
             'successful_runs': successful_runs,
             'success_rate': f"{successful_runs/total_runs:.2%}",
-            'total_rows_processed': total_rows_processed,
-            'total_rows_loaded': total_rows_loaded,
-            'avg_processing_time': f"{avg_processing_time:.2f}s",
-            'last_run': all_metrics[0].start_time.isoformat() if all_metrics else None
-        }
\ No newline at end of file
+            'total_rows_processed': int(index['input_rows'].sum()),
+            'total_rows_loaded': int(index['rows_loaded'].sum()),
+            'avg_processing_time': f"{index['processing_time_seconds'].sum() / total_runs:.2f}s",
+            'last_run': datetime.fromisoformat(index['start_time'].max()).isoformat()
+        }
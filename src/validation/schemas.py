@@ -3,10 +3,28 @@ Data validation schemas using Pandera.
 Defines structure, types, and business rules for operational data.
 """
 
+import pandas as pd
 import pandera as pa
 from pandera import Column, Check, DataFrameSchema
-from datetime import datetime
 import re
+from typing import Iterable, List, Optional, Tuple
+
+
+# Se evalúan sobre el valor completo (fullmatch) y con dígitos ASCII, igual
+# que el RE2 de Arrow en el camino rápido del validador
+OPERATION_ID_PATTERN = re.compile(r"^OP-[0-9]{8}$")
+ACCOUNT_PATTERN = re.compile(r"^[0-9]{3}-[0-9]{7}-[0-9]-[0-9]{2}$")
+
+OPERATION_TYPES = ["DEPOSITO", "RETIRO", "TRANSFERENCIA"]
+CURRENCIES = ["PEN", "USD"]
+STATUSES = ["COMPLETADA", "PENDIENTE", "FALLIDA"]
+CHANNELS = ["WEB", "MOBILE", "ATM", "SUCURSAL"]
+MAX_AMOUNT = 1_000_000
+
+# Incrementar cuando cambien las reglas: invalida resultados cacheados
+SCHEMA_VERSION = "3"
+
+_SCHEMA = None
 
 
 class OperationalSchema:
@@ -17,20 +35,32 @@ class OperationalSchema:
         """
         Returns Pandera schema for operational transactions.
         
+        The schema is built once and reused; the future-date check
+        evaluates the current time on each validation run.
+        
         Business rules:
         - Operation IDs must be unique and follow format OP-XXXXXXXX
         - Amounts must be positive and below 1M
         - Dates cannot be in the future
         - Account numbers follow format XXX-XXXXXXX-X-XX
         """
+        global _SCHEMA
+        if _SCHEMA is None:
+            _SCHEMA = OperationalSchema._build_schema()
+        return _SCHEMA
+    
+    @staticmethod
+    def _build_schema() -> DataFrameSchema:
+        """Construct the Pandera schema (see get_schema)."""
         return DataFrameSchema(
             columns={
                 "fecha_operacion": Column(
                     pa.DateTime,
                     nullable=False,
                     checks=[
-                        Check.less_than_or_equal_to(
-                            datetime.now(),
+                        Check(
+                            lambda s: s <= pd.Timestamp.now(),
+                            name="not_in_future",
                             error="Future dates not allowed"
                         )
                     ]
@@ -40,8 +70,9 @@ class OperationalSchema:
                     nullable=False,
                     unique=True,
                     checks=[
-                        Check.str_matches(
-                            r"^OP-\d{8}$",
+                        Check(
+                            lambda s: s.str.fullmatch(OPERATION_ID_PATTERN),
+                            name="str_matches",
                             error="Invalid operation ID format"
                         )
                     ]
@@ -50,7 +81,7 @@ class OperationalSchema:
                     pa.String,
                     nullable=False,
                     checks=[
-                        Check.isin(["DEPOSITO", "RETIRO", "TRANSFERENCIA"])
+                        Check.isin(OPERATION_TYPES)
                     ]
                 ),
                 "monto": Column(
@@ -59,7 +90,7 @@ class OperationalSchema:
                     checks=[
                         Check.greater_than(0, error="Amount must be positive"),
                         Check.less_than_or_equal_to(
-                            1_000_000,
+                            MAX_AMOUNT,
                             error="Amount exceeds maximum limit"
                         )
                     ]
@@ -67,14 +98,15 @@ class OperationalSchema:
                 "moneda": Column(
                     pa.String,
                     nullable=False,
-                    checks=[Check.isin(["PEN", "USD"])]
+                    checks=[Check.isin(CURRENCIES)]
                 ),
                 "cuenta_origen": Column(
                     pa.String,
                     nullable=False,
                     checks=[
-                        Check.str_matches(
-                            r"^\d{3}-\d{7}-\d-\d{2}$",
+                        Check(
+                            lambda s: s.str.fullmatch(ACCOUNT_PATTERN),
+                            name="str_matches",
                             error="Invalid account format"
                         )
                     ]
@@ -84,12 +116,12 @@ class OperationalSchema:
                 "estado": Column(
                     pa.String,
                     nullable=False,
-                    checks=[Check.isin(["COMPLETADA", "PENDIENTE", "FALLIDA"])]
+                    checks=[Check.isin(STATUSES)]
                 ),
                 "canal": Column(
                     pa.String,
                     nullable=False,
-                    checks=[Check.isin(["WEB", "MOBILE", "ATM", "SUCURSAL"])]
+                    checks=[Check.isin(CHANNELS)]
                 )
             },
             coerce=True,
@@ -97,7 +129,9 @@ class OperationalSchema:
         )
     
     @staticmethod
-    def validate_checksum(df, expected_total: float = None) -> bool:
+    def validate_checksum(
+        df, expected_total: float = None
+    ) -> Tuple[bool, Optional[float]]:
         """
         Validates total amount checksum.
         
@@ -106,39 +140,90 @@ class OperationalSchema:
             expected_total: Expected sum of amounts (optional)
         
         Returns:
-            True if checksum passes
+            Tuple of (passed, actual_total); actual_total is None when no
+            expected total is given
         """
         if expected_total is None:
-            return True
+            return True, None
         
-        actual_total = df['monto'].sum()
+        actual_total = float(df['monto'].sum())
         tolerance = 0.01
         
-        return abs(actual_total - expected_total) < tolerance
+        return abs(actual_total - expected_total) < tolerance, actual_total
 
 
 class ValidationReport:
     """Container for validation results."""
     
+    # Máximo de errores detallados; el resto solo se cuenta
+    MAX_ERRORS = 10_000
+    
     def __init__(self):
         self.total_rows = 0
         self.valid_rows = 0
         self.invalid_rows = 0
-        self.errors = []
+        # Errores en columnas paralelas (fila, columna, mensaje) en lugar de
+        # un dict por error; los dicts solo se arman al exportar
+        self._error_rows = []
+        self._error_columns = []
+        self._error_messages = []
+        self.truncated_errors = 0
         self.warnings = []
     
+    @property
+    def errors(self) -> List[dict]:
+        """Validation errors as {row, column, error} records."""
+        return [
+            {'row': row, 'column': column, 'error': message}
+            for row, column, message in zip(
+                self._error_rows, self._error_columns, self._error_messages
+            )
+        ]
+    
     def add_error(self, row_index: int, column: str, error_msg: str):
-        """Add validation error."""
-        self.errors.append({
-            'row': row_index,
-            'column': column,
-            'error': error_msg
-        })
+        """Add validation error (only counted once MAX_ERRORS is reached)."""
+        if len(self._error_rows) >= self.MAX_ERRORS:
+            self.truncated_errors += 1
+            return
+        self._error_rows.append(row_index)
+        self._error_columns.append(column)
+        self._error_messages.append(error_msg)
+    
+    def add_errors(
+        self,
+        row_indices: Iterable[int],
+        columns: Iterable[str],
+        error_msgs: Iterable[str]
+    ):
+        """Add validation errors in bulk from parallel sequences, up to MAX_ERRORS."""
+        row_indices = list(row_indices)
+        room = max(self.MAX_ERRORS - len(self._error_rows), 0)
+        
+        self._error_rows.extend(row_indices[:room])
+        self._error_columns.extend(list(columns)[:room])
+        self._error_messages.extend(list(error_msgs)[:room])
+        self.truncated_errors += max(len(row_indices) - room, 0)
     
     def add_warning(self, message: str):
         """Add validation warning."""
         self.warnings.append(message)
     
+    @classmethod
+    def from_dict(cls, data: dict) -> 'ValidationReport':
+        """Rebuild a report from its to_dict() representation."""
+        report = cls()
+        report.total_rows = data['total_rows']
+        report.valid_rows = data['valid_rows']
+        report.invalid_rows = data['invalid_rows']
+        report.add_errors(
+            [error['row'] for error in data['errors']],
+            [error['column'] for error in data['errors']],
+            [error['error'] for error in data['errors']]
+        )
+        report.truncated_errors = data.get('truncated_errors', 0)
+        report.warnings = list(data['warnings'])
+        return report
+    
     def to_dict(self):
         """Convert report to dictionary."""
         return {
@@ -147,5 +232,6 @@ class ValidationReport:
             'invalid_rows': self.invalid_rows,
             'success_rate': self.valid_rows / self.total_rows if self.total_rows > 0 else 0,
             'errors': self.errors,
+            'truncated_errors': self.truncated_errors,
             'warnings': self.warnings
         }
\ No newline at end of file
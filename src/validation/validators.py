@@ -3,12 +3,42 @@ Data validation engine.
 Orchestrates schema validation and business rule checks.
 """
 
+import numpy as np
 import pandas as pd
 import pandera as pa
 from typing import Tuple, Optional
 import hashlib
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 
-from .schemas import OperationalSchema, ValidationReport
+from .schemas import (
+    OperationalSchema,
+    ValidationReport,
+    OPERATION_ID_PATTERN,
+    ACCOUNT_PATTERN,
+    OPERATION_TYPES,
+    CURRENCIES,
+    STATUSES,
+    CHANNELS,
+    MAX_AMOUNT,
+    SCHEMA_VERSION,
+)
+from ..utils.cache import StageCache, file_digest
+
+try:
+    import pyarrow
+    import pyarrow.compute as pc
+except ImportError:  # pyarrow is optional: falls back to the C parser and Python re
+    pyarrow = None
+    pc = None
+
+# Longitud fija de los patrones anclados, usada como prefiltro barato
+OPERATION_ID_LENGTH = 11
+ACCOUNT_LENGTH = 16
+
+# Por debajo de este tamaño los chequeos corren en serie
+PARALLEL_CHECK_MIN_ROWS = 100_000
 
 
 class DataValidator:
@@ -23,18 +53,31 @@ class DataValidator:
         """
         self.schema = schema or OperationalSchema.get_schema()
         self.report = ValidationReport()
+        
+        # El camino rápido está especializado para el esquema por defecto;
+        # se decide una sola vez al construir el validador
+        self._use_fast_path = self.schema is OperationalSchema.get_schema()
+        self._schema_columns = frozenset(self.schema.columns)
     
     def validate(
         self, 
         df: pd.DataFrame,
-        expected_checksum: Optional[float] = None
+        expected_checksum: Optional[float] = None,
+        detailed_errors: bool = True
     ) -> Tuple[pd.DataFrame, ValidationReport]:
         """
         Validate DataFrame against schema and business rules.
         
+        With the default schema, rows are first checked with vectorized
+        pandas operations; Pandera only runs when some rows fail and a
+        detailed error report is requested, or when the input has types the
+        fast path does not handle. Either way the valid rows come back with
+        the schema's dtype coercion applied.
+        
         Args:
             df: Input DataFrame
             expected_checksum: Expected total amount for validation
+            detailed_errors: Collect per-cell errors for failing rows
         
         Returns:
             Tuple of (validated_df, validation_report)
@@ -42,28 +85,107 @@ class DataValidator:
         self.report = ValidationReport()
         self.report.total_rows = len(df)
         
-        try:
-            validated_df = self.schema.validate(df, lazy=True)
+        fast_result = None
+        if self._use_fast_path:
+            fast_result = self._fast_validate(df)
+        
+        if fast_result is not None and (fast_result[1].all() or not detailed_errors):
+            coerced_df, valid_mask = fast_result
+            validated_df = self._coerce_valid_rows(coerced_df[valid_mask].reset_index(drop=True))
             self.report.valid_rows = len(validated_df)
-            
-        except pa.errors.SchemaErrors as e:
-            validated_df = self._handle_schema_errors(df, e)
+        else:
+            try:
+                validated_df = self.schema.validate(df, lazy=True)
+                self.report.valid_rows = len(validated_df)
+                
+            except pa.errors.SchemaErrors as e:
+                validated_df = self._coerce_valid_rows(self._handle_schema_errors(df, e))
         
         if expected_checksum is not None:
-            checksum_valid = OperationalSchema.validate_checksum(
+            checksum_valid, actual_total = OperationalSchema.validate_checksum(
                 validated_df, 
                 expected_checksum
             )
             if not checksum_valid:
                 self.report.add_warning(
                     f"Checksum mismatch: expected {expected_checksum}, "
-                    f"got {validated_df['monto'].sum()}"
+                    f"got {actual_total}"
                 )
         
         self.report.invalid_rows = self.report.total_rows - self.report.valid_rows
         
         return validated_df, self.report
     
+    def _fast_validate(
+        self,
+        df: pd.DataFrame
+    ) -> Optional[Tuple[pd.DataFrame, np.ndarray]]:
+        """
+        Vectorized equivalent of the default OperationalSchema.
+        
+        Args:
+            df: Input DataFrame
+        
+        Returns:
+            Tuple of (coerced_df, valid_mask), or None if a schema column
+            is missing, an ID column holds non-text values or the dates are
+            timezone-aware (Pandera then validates the frame)
+        """
+        if not self._schema_columns.issubset(df.columns):
+            return None
+        
+        # Pandera convierte esas columnas a texto antes de aplicar los patrones
+        if not (_is_text(df['numero_operacion']) and _is_text(df['cuenta_origen'])):
+            return None
+        
+        try:
+            fecha = pd.to_datetime(df['fecha_operacion'], errors='coerce')
+        except (TypeError, ValueError):
+            return None
+        
+        # Fechas con zona horaria no se comparan contra pd.Timestamp.now()
+        if not pd.api.types.is_datetime64_dtype(fecha.dtype):
+            return None
+        
+        monto = pd.to_numeric(df['monto'], errors='coerce')
+        numero = df['numero_operacion']
+        
+        # Chequeos independientes por columna; en tablas grandes se reparten
+        # entre hilos (los kernels de Arrow y de hashing liberan el GIL)
+        checks = [
+            lambda: (fecha.notna() & (fecha <= pd.Timestamp.now())).to_numpy(),
+            lambda: _match_fixed_length(numero, OPERATION_ID_PATTERN, OPERATION_ID_LENGTH)
+            & ~numero.duplicated(keep=False).to_numpy(),
+            lambda: df['tipo_operacion'].isin(OPERATION_TYPES).to_numpy(),
+            lambda: ((monto > 0) & (monto <= MAX_AMOUNT)).to_numpy(),
+            lambda: df['moneda'].isin(CURRENCIES).to_numpy(),
+            lambda: _match_fixed_length(df['cuenta_origen'], ACCOUNT_PATTERN, ACCOUNT_LENGTH),
+            lambda: df['banco_origen'].notna().to_numpy(),
+            lambda: df['descripcion'].notna().to_numpy(),
+            lambda: df['estado'].isin(STATUSES).to_numpy(),
+            lambda: df['canal'].isin(CHANNELS).to_numpy(),
+        ]
+        
+        if len(df) >= PARALLEL_CHECK_MIN_ROWS:
+            with ThreadPoolExecutor(max_workers=min(len(checks), os.cpu_count() or 1)) as executor:
+                masks = list(executor.map(lambda check: check(), checks))
+        else:
+            masks = [check() for check in checks]
+        
+        valid_mask = np.logical_and.reduce(masks)
+        
+        return df.assign(fecha_operacion=fecha, monto=monto), valid_mask
+    
+    def _coerce_valid_rows(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Apply the schema's dtype coercion to rows that passed validation."""
+        if not self._schema_columns.issubset(df.columns):
+            return df
+        
+        try:
+            return self.schema.coerce_dtype(df)
+        except (pa.errors.SchemaError, pa.errors.SchemaErrors):
+            return df
+    
     def _handle_schema_errors(
         self, 
         df: pd.DataFrame, 
@@ -80,27 +202,32 @@ class DataValidator:
             DataFrame with only valid rows
         """
         failure_cases = error.failure_cases
+        n_cases = len(failure_cases)
         
-        for _, case in failure_cases.iterrows():
-            self.report.add_error(
-                row_index=case.get('index', -1),
-                column=case.get('column', 'unknown'),
-                error_msg=str(case.get('check', 'validation failed'))
+        if 'index' in failure_cases.columns:
+            rows = pd.to_numeric(failure_cases['index'], errors='coerce')
+        else:
+            rows = pd.Series(np.nan, index=failure_cases.index)
+        
+        # Extracción por columnas en lugar de iterrows(); los errores a nivel
+        # de columna (sin fila) quedan con índice -1
+        self.report.add_errors(
+            rows.fillna(-1).astype('int64').tolist(),
+            (
+                failure_cases['column'].fillna('unknown').tolist()
+                if 'column' in failure_cases.columns else ['unknown'] * n_cases
+            ),
+            (
+                failure_cases['check'].astype(str).tolist()
+                if 'check' in failure_cases.columns else ['validation failed'] * n_cases
             )
+        )
         
-        invalid_indices = set()
+        invalid_indices = rows.dropna().astype('int64').unique()
         
-        if 'index' in failure_cases.columns:
-            for idx in failure_cases['index'].dropna():
-                if idx is not None and pd.notna(idx):
-                    try:
-                        invalid_indices.add(int(idx))
-                    except (ValueError, TypeError):
-                        continue
-        
-        if invalid_indices:
-            valid_mask = ~df.index.isin(invalid_indices)
-            valid_df = df[valid_mask].copy().reset_index(drop=True)
+        if len(invalid_indices):
+            valid_mask = ~np.isin(df.index.to_numpy(), invalid_indices)
+            valid_df = df.iloc[np.flatnonzero(valid_mask)].reset_index(drop=True)
         else:
             valid_df = df.copy()
         
@@ -108,7 +235,7 @@ class DataValidator:
         
         return valid_df
     
-    def validate_duplicates(self, df: pd.DataFrame) -> pd.DataFrame:
+    def validate_duplicates(self, df: pd.DataFrame) -> pd.Series:
         """
         Check for duplicate operation IDs.
         
@@ -116,17 +243,17 @@ class DataValidator:
             df: DataFrame to check
         
         Returns:
-            DataFrame with duplicates flagged
+            Boolean mask, True for repeats of an earlier operation ID
         """
-        df['is_duplicate'] = df.duplicated(subset=['numero_operacion'], keep='first')
+        duplicate_mask = df['numero_operacion'].duplicated(keep='first')
         
-        duplicate_count = df['is_duplicate'].sum()
+        duplicate_count = int(duplicate_mask.sum())
         if duplicate_count > 0:
             self.report.add_warning(
                 f"Found {duplicate_count} duplicate operation IDs"
             )
         
-        return df
+        return duplicate_mask
     
     def generate_content_hash(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -140,26 +267,113 @@ class DataValidator:
         """
         hash_columns = ['numero_operacion', 'monto', 'fecha_operacion', 'cuenta_origen']
         
-        df['content_hash'] = df[hash_columns].apply(
-            lambda row: hashlib.sha256(
-                ''.join(str(row[col]) for col in hash_columns).encode()
-            ).hexdigest()[:16],
-            axis=1
+        # Concatenación vectorizada; solo el SHA-256 queda por fila
+        joined = df[hash_columns[0]].astype(str).str.cat(
+            [df[col].astype(str) for col in hash_columns[1:]]
         )
+        df['content_hash'] = [
+            hashlib.sha256(value.encode()).hexdigest()[:16]
+            for value in joined.to_numpy()
+        ]
         
         return df
 
 
-def quick_validate(csv_path: str) -> Tuple[pd.DataFrame, ValidationReport]:
+def _is_text(series: pd.Series) -> bool:
+    """True if every non-null value (or category) of the column is a string."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.cat.categories
+    return pd.api.types.infer_dtype(series, skipna=True) in ('string', 'empty')
+
+
+def _match_fixed_length(
+    series: pd.Series,
+    pattern: re.Pattern,
+    length: int
+) -> np.ndarray:
+    """
+    Match a fixed-length pattern against each whole value of a column.
+    
+    Values with the wrong length are rejected up front; the rest are
+    matched in one call with Arrow's RE2 engine when pyarrow is available,
+    otherwise with pandas' str.fullmatch. Both require the whole value to
+    match, like the schema's checks.
+    
+    Args:
+        series: Column to check
+        pattern: Compiled anchored pattern
+        length: Length of any matching value
+    
+    Returns:
+        Boolean mask, False for nulls and non-matching values
+    """
+    if not _is_text(series):
+        # Como Pandera, los valores no textuales se comparan como texto
+        series = series.astype(str).where(series.notna())
+    
+    if pc is not None:
+        try:
+            arr = pyarrow.array(series, type=pyarrow.string(), from_pandas=True)
+        except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+            arr = None
+        
+        if arr is not None:
+            length_ok = pc.fill_null(pc.equal(pc.utf8_length(arr), length), False)
+            candidates = np.flatnonzero(length_ok.to_numpy(zero_copy_only=False))
+            
+            mask = np.zeros(len(series), dtype=bool)
+            matched = pc.match_substring_regex(arr.take(candidates), pattern.pattern)
+            mask[candidates] = pc.fill_null(matched, False).to_numpy(zero_copy_only=False)
+            return mask
+    
+    return series.str.fullmatch(pattern, na=False).to_numpy(dtype=bool)
+
+
+def _read_operations_csv(csv_path: str) -> pd.DataFrame:
+    """
+    Read an operations CSV, using the multi-threaded Arrow parser if available.
+    
+    Text columns of the schema are read as strings without type inference;
+    fecha_operacion is parsed as dates (left as text if some values are invalid,
+    so the validator can report them).
+    """
+    dtype = {
+        name: 'object' for name in OperationalSchema.get_schema().columns
+        if name not in ('fecha_operacion', 'monto')
+    }
+    
+    return pd.read_csv(
+        csv_path,
+        parse_dates=['fecha_operacion'],
+        dtype=dtype,
+        engine='pyarrow' if pyarrow is not None else 'c'
+    )
+
+
+def quick_validate(
+    csv_path: str,
+    cache: Optional[StageCache] = None
+) -> Tuple[pd.DataFrame, ValidationReport]:
     """
     Convenience function for quick validation of CSV file.
     
     Args:
         csv_path: Path to CSV file
+        cache: Optional stage cache; results are keyed by file content
+            and schema version
     
     Returns:
         Tuple of (validated_df, report)
     """
-    df = pd.read_csv(csv_path, parse_dates=['fecha_operacion'])
-    validator = DataValidator()
-    return validator.validate(df)
\ No newline at end of file
+    def compute():
+        df = _read_operations_csv(csv_path)
+        validated_df, report = DataValidator().validate(df)
+        return validated_df, report.to_dict()
+    
+    if cache is None:
+        validated_df, report_dict = compute()
+    else:
+        key = f"validation_{file_digest(csv_path)}_{SCHEMA_VERSION}"
+        validated_df, report_dict = cache.get_or_compute(key, compute)
+    
+    return validated_df, ValidationReport.from_dict(report_dict)
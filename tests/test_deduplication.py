@@ -2,22 +2,20 @@
 Test deduplication engine.
 """
 
-import sys
 from pathlib import Path
 
-project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root))
-
 import pandas as pd
 from src.deduplication.dedup_engine import DeduplicationEngine, AdvancedDeduplicator
 
+project_root = Path(__file__).parent.parent
+
 
 def main():
-    validated_path = project_root / 'data' / 'processed' / 'validated_operations.csv'
+    validated_path = project_root / 'data' / 'processed' / 'validated_operations.parquet'
     
     if not validated_path.exists():
         print(f"Error: File not found: {validated_path}")
-        print("Run 'python tests/test_validation.py' first")
+        print("Run 'python -m tests.test_validation' first")
         return
     
     print("=" * 70)
@@ -25,7 +23,7 @@ def main():
     print("=" * 70)
     
     print(f"\nLoading: {validated_path}")
-    df = pd.read_csv(validated_path, parse_dates=['fecha_operacion'])
+    df = pd.read_parquet(validated_path, engine='pyarrow')
     print(f"Loaded {len(df):,} rows")
     
     print("\n" + "-" * 70)
@@ -87,7 +85,8 @@ def main():
     print(f"Removed: {len(df) - len(priority_deduped):,}")
     
     output_path = project_root / 'data' / 'processed' / 'deduplicated_operations.csv'
-    deduped_df.to_csv(output_path, index=False)
+    with open(output_path, 'w', encoding='utf-8', buffering=1 << 20, newline='') as f:
+        deduped_df.to_csv(f, index=False, chunksize=100_000, lineterminator='\n')
     print(f"\nDeduplicated data saved to: {output_path}")
     
     print("\nSample of deduplicated data:")
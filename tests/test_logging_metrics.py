@@ -2,17 +2,14 @@
 Test logging and metrics functionality.
 """
 
-import sys
-from pathlib import Path
-
-project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root))
-
 from src.utils.logging_config import setup_logging, get_logger
-from src.utils.metrics import PipelineMetrics, MetricsCollector
+from src.utils.metrics import PipelineMetrics, MetricsCollector, SUMMARY_INDEX_FILE
 from datetime import datetime
+import os
 import time
 
+import pandas as pd
+
 
 def test_logging():
     """Test structured logging."""
@@ -99,6 +96,65 @@ def test_metrics_collector():
     print("\nPASSED")
 
 
+def _save_run(storage_dir, pipeline_id: str, status: str = "success", rows_loaded: int = 90):
+    """Store one finished run with 100 input rows in storage_dir."""
+    metrics = PipelineMetrics(
+        pipeline_id=pipeline_id,
+        start_time=datetime(2025, 1, 15, 10, int(pipeline_id[-1])),
+        input_rows=100,
+        rows_loaded=rows_loaded,
+        processing_time_seconds=2.0,
+        status=status
+    )
+    return metrics.save(str(storage_dir))
+
+
+def test_aggregated_stats_come_from_summary_index(tmp_path):
+    _save_run(tmp_path, "run_1")
+    _save_run(tmp_path, "run_2", status="failed", rows_loaded=0)
+    
+    stats = MetricsCollector(str(tmp_path)).get_aggregated_stats()
+    
+    assert stats['total_runs'] == 2
+    assert stats['successful_runs'] == 1
+    assert stats['total_rows_processed'] == 200
+    assert stats['total_rows_loaded'] == 90
+    assert stats['last_run'] == datetime(2025, 1, 15, 10, 2).isoformat()
+    assert len(pd.read_parquet(tmp_path / SUMMARY_INDEX_FILE)) == 2
+
+
+def test_summary_index_refreshes_new_changed_and_removed_runs(tmp_path):
+    collector = MetricsCollector(str(tmp_path))
+    changed = _save_run(tmp_path, "run_1")
+    removed = _save_run(tmp_path, "run_2")
+    collector.get_aggregated_stats()
+    
+    _save_run(tmp_path, "run_1", rows_loaded=50)
+    # Otro mtime aunque la reescritura caiga en el mismo tick del reloj
+    stat = os.stat(changed)
+    os.utime(changed, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    os.remove(removed)
+    _save_run(tmp_path, "run_3")
+    
+    stats = collector.get_aggregated_stats()
+    
+    assert stats['total_runs'] == 2
+    assert stats['total_rows_loaded'] == 140
+    index = pd.read_parquet(tmp_path / SUMMARY_INDEX_FILE)
+    assert sorted(index['file']) == ["metrics_run_1.json", "metrics_run_3.json"]
+
+
+def test_summary_index_is_rebuilt_when_unreadable(tmp_path):
+    _save_run(tmp_path, "run_1")
+    (tmp_path / SUMMARY_INDEX_FILE).write_bytes(b"not a parquet file")
+    
+    stats = MetricsCollector(str(tmp_path)).get_aggregated_stats()
+    
+    assert stats['total_runs'] == 1
+    assert len(pd.read_parquet(tmp_path / SUMMARY_INDEX_FILE)) == 1
+    assert not list(tmp_path.glob("*.tmp"))
+
+
 def main():
     test_logging()
     test_metrics()
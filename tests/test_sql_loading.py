@@ -2,15 +2,15 @@
 Test SQL loading functionality with SQLite and SQL Server.
 """
 
-import sys
 from pathlib import Path
 
-project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root))
-
 import pandas as pd
+import pytest
+from sqlalchemy import text
 from src.loading.sql_loader import SQLLoader, DatabaseConfig
 
+project_root = Path(__file__).parent.parent
+
 
 def test_sqlite():
     """Test with SQLite database."""
@@ -114,6 +114,142 @@ def run_test(config: DatabaseConfig, db_name: str):
         return False
 
 
+def _operations(ids, monto: float = 100.0) -> pd.DataFrame:
+    """Valid operations frame with one row per numeric operation ID."""
+    ids = list(ids)
+    return pd.DataFrame({
+        'fecha_operacion': pd.Timestamp('2025-01-15 10:30:00'),
+        'numero_operacion': [f"OP-{i:08d}" for i in ids],
+        'tipo_operacion': 'DEPOSITO',
+        'monto': monto,
+        'moneda': 'PEN',
+        'cuenta_origen': '191-1234567-0-89',
+        'cuenta_destino': None,
+        'banco_origen': 'BCP',
+        'banco_destino': None,
+        'descripcion': 'Pago de servicios',
+        'estado': 'COMPLETADA',
+        'canal': 'WEB',
+        'content_hash': [f"{i:016x}" for i in ids],
+    })
+
+
+@pytest.fixture
+def sqlite_loader(tmp_path):
+    loader = SQLLoader(DatabaseConfig(db_type='sqlite', database=str(tmp_path / 'etl.db')))
+    loader.connect()
+    yield loader
+    loader.close()
+
+
+def test_bulk_load_lets_database_stamp_fecha_carga(sqlite_loader):
+    sqlite_loader.create_table()
+    sqlite_loader.bulk_load(_operations(range(1, 4)).assign(fecha_carga=pd.Timestamp('2000-01-01')))
+    
+    stamped = pd.to_datetime(sqlite_loader.query_data()['fecha_carga'])
+    assert (abs(stamped - pd.Timestamp.now()) < pd.Timedelta(minutes=5)).all()
+
+
+def test_create_table_adds_load_default_to_legacy_table(sqlite_loader):
+    columns = ", ".join(_operations([1]).columns)
+    with sqlite_loader.engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE TABLE operaciones (id INTEGER PRIMARY KEY, {columns}, "
+            f"fecha_carga DATETIME, is_duplicate INTEGER)"
+        ))
+    
+    sqlite_loader.create_table()
+    sqlite_loader.bulk_load(_operations(range(1, 3)))
+    
+    stamped = pd.to_datetime(sqlite_loader.query_data()['fecha_carga'])
+    assert stamped.notna().all()
+    assert (abs(stamped - pd.Timestamp.now()) < pd.Timedelta(minutes=5)).all()
+
+
+def test_upsert_sqlite_counts_inserted_and_updated_rows(sqlite_loader):
+    sqlite_loader.create_table()
+    
+    first = sqlite_loader.upsert_data(_operations(range(1, 4)))
+    assert (first['rows_inserted'], first['rows_updated']) == (3, 0)
+    
+    second = sqlite_loader.upsert_data(_operations(range(2, 6), monto=250.0))
+    assert (second['rows_inserted'], second['rows_updated']) == (2, 2)
+    
+    stored = sqlite_loader.query_data().set_index('numero_operacion')['monto']
+    assert len(stored) == 5
+    assert stored['OP-00000001'] == 100.0
+    assert stored['OP-00000002'] == 250.0
+
+
+def test_create_table_rejects_repeated_operation_ids(sqlite_loader):
+    columns = ", ".join(_operations([1]).columns)
+    with sqlite_loader.engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE TABLE operaciones (id INTEGER PRIMARY KEY, {columns}, "
+            f"fecha_carga DATETIME, is_duplicate INTEGER)"
+        ))
+    _operations([1, 1, 2]).to_sql('operaciones', sqlite_loader.engine, if_exists='append', index=False)
+    
+    with pytest.raises(RuntimeError, match="appear more than once"):
+        sqlite_loader.create_table()
+
+
+def test_bulk_load_keeps_last_row_for_repeated_keys(sqlite_loader):
+    sqlite_loader.create_table()
+    df = pd.concat([_operations([1, 2]), _operations([2], monto=300.0)], ignore_index=True)
+    
+    stats = sqlite_loader.bulk_load(df)
+    
+    assert stats['rows_inserted'] == 2
+    stored = sqlite_loader.query_data().set_index('numero_operacion')['monto']
+    assert stored.to_dict() == {'OP-00000001': 100.0, 'OP-00000002': 300.0}
+
+
+def test_bulk_load_inserts_into_empty_table(sqlite_loader):
+    sqlite_loader.create_table()
+    
+    stats = sqlite_loader.bulk_load(_operations(range(1, 6)))
+    
+    assert stats == {'rows_inserted': 5, 'rows_updated': 0, 'rows_failed': 0, 'total_processed': 5}
+    assert sqlite_loader.get_table_stats()['total_rows'] == 5
+
+
+def test_bulk_load_upserts_into_non_empty_table(sqlite_loader):
+    sqlite_loader.create_table()
+    sqlite_loader.bulk_load(_operations(range(1, 4)))
+    
+    stats = sqlite_loader.bulk_load(_operations(range(3, 6), monto=500.0))
+    
+    assert (stats['rows_inserted'], stats['rows_updated']) == (2, 1)
+    stored = sqlite_loader.query_data().set_index('numero_operacion')['monto']
+    assert len(stored) == 5
+    assert stored['OP-00000003'] == 500.0
+
+
+def test_query_data_binds_filter_values_and_limit(sqlite_loader):
+    sqlite_loader.create_table()
+    df = _operations(range(1, 6))
+    df.loc[[1, 3], 'estado'] = 'PENDIENTE'
+    sqlite_loader.bulk_load(df)
+    
+    pending = sqlite_loader.query_data(filters={'estado': 'PENDIENTE'})
+    assert sorted(pending['numero_operacion']) == ['OP-00000002', 'OP-00000004']
+    
+    # El valor viaja como parámetro: una comilla no altera la consulta
+    injected = sqlite_loader.query_data(filters={'estado': "X' OR '1'='1"})
+    assert injected.empty
+    
+    assert len(sqlite_loader.query_data(limit=2)) == 2
+    assert len(sqlite_loader.query_data(filters={'moneda': 'PEN'}, limit=3)) == 3
+
+
+def test_query_data_rejects_unknown_filter_columns(sqlite_loader):
+    sqlite_loader.create_table()
+    
+    with pytest.raises(ValueError, match="Unknown column"):
+        sqlite_loader.query_data(filters={'estado = estado OR 1': 1})
+
+
 def main():
     print("=" * 70)
     print("SQL LOADING TESTS")
@@ -2,14 +2,147 @@
 Test validation module with synthetic data.
 """
 
-import sys
+import os
 from pathlib import Path
 
+import pandas as pd
+import pyarrow as pa
+import pytest
+from src.validation import validators
+from src.validation.validators import DataValidator, quick_validate
+from src.validation.schemas import OperationalSchema, ValidationReport, SCHEMA_VERSION
+from src.utils.cache import StageCache, file_digest
+from scripts.run_etl_pipeline import DTYPES
+
 project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root))
 
-import pandas as pd
-from src.validation.validators import DataValidator
+# Mismos tipos explícitos que el pipeline (sin inferencia); las fechas se
+# leen como texto que se parsea después. content_hash no se lee: el
+# validador lo recalcula
+CSV_DTYPES = {
+    'fecha_operacion': 'string[pyarrow]',
+    **{col: dtype for col, dtype in DTYPES.items() if col != 'content_hash'},
+}
+
+# fecha_operacion viene en ISO 8601, con o sin fracción de segundo según la
+# versión del generador que produjo el archivo
+DATE_FORMAT = 'ISO8601'
+
+# Columnas mostradas en la vista previa de datos validados
+PREVIEW_COLS = ['numero_operacion', 'fecha_operacion', 'monto', 'estado', 'content_hash']
+
+
+def _operations(n: int = 4) -> pd.DataFrame:
+    """Valid operations frame with n rows."""
+    return pd.DataFrame({
+        'fecha_operacion': pd.Timestamp('2025-01-15 10:30:00'),
+        'numero_operacion': [f"OP-{i:08d}" for i in range(1, n + 1)],
+        'tipo_operacion': pd.Categorical(['DEPOSITO'] * n),
+        'monto': 100.0,
+        'moneda': pd.Categorical(['PEN'] * n),
+        'cuenta_origen': '191-1234567-0-89',
+        'cuenta_destino': None,
+        'banco_origen': pd.Categorical(['BCP'] * n),
+        'banco_destino': None,
+        'descripcion': 'Pago de servicios',
+        'estado': pd.Categorical(['COMPLETADA'] * n),
+        'canal': pd.Categorical(['WEB'] * n),
+    })
+
+
+def test_fast_path_agrees_with_pandera_on_valid_frame():
+    df = _operations()
+    
+    fast_df, fast_report = DataValidator().validate(df)
+    # Una instancia propia del esquema desactiva el camino rápido
+    pandera_df, pandera_report = DataValidator(OperationalSchema._build_schema()).validate(df)
+    
+    assert fast_report.valid_rows == pandera_report.valid_rows == 4
+    pd.testing.assert_frame_equal(fast_df, pandera_df)
+
+
+def test_fast_path_agrees_with_pandera_on_invalid_rows():
+    df = _operations(5)
+    df.loc[1, 'monto'] = -5.0
+    df.loc[3, 'numero_operacion'] = 'OP-123'
+    
+    fast_df, fast_report = DataValidator().validate(df, detailed_errors=False)
+    pandera_df, pandera_report = DataValidator().validate(df, detailed_errors=True)
+    
+    assert fast_report.valid_rows == pandera_report.valid_rows == 3
+    assert pandera_report.errors
+    pd.testing.assert_frame_equal(fast_df, pandera_df)
+    assert fast_df['estado'].dtype == object
+
+
+@pytest.mark.parametrize('detailed_errors', [True, False])
+def test_non_text_operation_ids_are_reported_not_raised(detailed_errors):
+    df = _operations(2).assign(numero_operacion=[1, 2])
+    
+    validated_df, report = DataValidator().validate(df, detailed_errors=detailed_errors)
+    
+    assert report.valid_rows == 0
+    assert report.invalid_rows == 2
+
+
+@pytest.mark.parametrize('detailed_errors', [True, False])
+def test_timezone_aware_dates_are_validated(detailed_errors):
+    df = _operations(2).assign(fecha_operacion=pd.Timestamp('2025-01-15 10:30:00', tz='UTC'))
+    
+    validated_df, report = DataValidator().validate(df, detailed_errors=detailed_errors)
+    
+    assert report.valid_rows == 2
+
+
+@pytest.mark.parametrize('detailed_errors', [True, False])
+@pytest.mark.parametrize('use_arrow', [True, False])
+def test_patterns_must_match_the_whole_value(monkeypatch, detailed_errors, use_arrow):
+    if not use_arrow:
+        monkeypatch.setattr(validators, 'pc', None)
+    df = _operations(3)
+    df.loc[0, 'numero_operacion'] = 'OP-00000001\n'
+    df.loc[1, 'cuenta_origen'] = '191-1234567-0-89\n'
+    
+    validated_df, report = DataValidator().validate(df, detailed_errors=detailed_errors)
+    
+    assert validated_df['numero_operacion'].tolist() == ['OP-00000003']
+    assert report.invalid_rows == 2
+
+
+def test_stage_cache_hits_until_input_changes(tmp_path):
+    csv_path = tmp_path / 'operaciones.csv'
+    _operations(3).to_csv(csv_path, index=False)
+    cache = StageCache(str(tmp_path / 'cache'))
+    
+    first_df, first_report = quick_validate(str(csv_path), cache=cache)
+    second_df, second_report = quick_validate(str(csv_path), cache=cache)
+    
+    assert (cache.hits, cache.misses) == (1, 1)
+    pd.testing.assert_frame_equal(first_df, second_df)
+    assert second_report.to_dict() == first_report.to_dict()
+    
+    # Otro contenido, otra clave: se valida de nuevo
+    _operations(2).to_csv(csv_path, index=False)
+    changed_df, changed_report = quick_validate(str(csv_path), cache=cache)
+    
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert changed_report.total_rows == 2
+
+
+def test_validation_report_round_trips_through_dict(monkeypatch):
+    monkeypatch.setattr(ValidationReport, 'MAX_ERRORS', 3)
+    report = ValidationReport()
+    report.total_rows, report.valid_rows, report.invalid_rows = 10, 5, 5
+    report.add_errors(range(4), ['monto'] * 4, ['Amount must be positive'] * 4)
+    report.add_error(7, 'estado', 'isin')
+    report.add_warning('Found 1 duplicate operation IDs')
+    
+    assert len(report.errors) == 3
+    assert report.truncated_errors == 2
+    
+    restored = ValidationReport.from_dict(report.to_dict())
+    
+    assert restored.to_dict() == report.to_dict()
 
 
 def main():
@@ -24,8 +157,29 @@ def main():
     print("DATA VALIDATION TEST")
     print("=" * 70)
     
+    output_dir = project_root / 'data' / 'processed'
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_path = output_dir / 'validated_operations.parquet'
+    meta_path = output_dir / 'validated_operations.meta'
+    
+    # Si la entrada y el esquema no cambiaron, el artefacto ya está al día
+    input_key = f"{file_digest(csv_path)}_{SCHEMA_VERSION}"
+    if (
+        not os.getenv('VALIDATE_FORCE')
+        and output_path.exists()
+        and meta_path.exists()
+        and meta_path.read_text() == input_key
+    ):
+        print(f"\nInput unchanged; reusing {output_path}")
+        print("Set VALIDATE_FORCE=1 to validate again")
+        return
+    
     print(f"\nLoading: {csv_path}")
-    df = pd.read_csv(csv_path)
+    # El motor pyarrow no acepta memory_map=True; se le pasa el archivo ya mapeado
+    with pa.memory_map(str(csv_path)) as source:
+        df = pd.read_csv(
+            source, engine='pyarrow', usecols=list(CSV_DTYPES), dtype=CSV_DTYPES
+        )
     print(f"Loaded {len(df):,} rows")
     
     print("\nColumn dtypes before parsing:")
@@ -33,7 +187,9 @@ def main():
     
     print("\nParsing dates...")
     try:
-        df['fecha_operacion'] = pd.to_datetime(df['fecha_operacion'], errors='coerce')
+        df['fecha_operacion'] = pd.to_datetime(
+            df['fecha_operacion'], format=DATE_FORMAT, errors='coerce'
+        )
     except Exception as e:
         print(f"Warning: Could not parse all dates: {e}")
     
@@ -75,20 +231,26 @@ def main():
             print(f"  - {warning}")
     
     print("\nChecking duplicates...")
-    validated_df = validator.validate_duplicates(validated_df)
+    duplicate_mask = validator.validate_duplicates(validated_df)
+    print(f"Duplicate operation IDs: {duplicate_mask.sum():,}")
     
     print("\nGenerating content hashes...")
     validated_df = validator.generate_content_hash(validated_df)
     
-    output_dir = project_root / 'data' / 'processed'
-    output_dir.mkdir(parents=True, exist_ok=True)
-    output_path = output_dir / 'validated_operations.csv'
-    
-    validated_df.to_csv(output_path, index=False)
+    validated_df.to_parquet(
+        output_path,
+        index=False,
+        engine='pyarrow',
+        compression='zstd',
+        use_dictionary=True
+    )
+    meta_path.write_text(input_key)
     print(f"\nValidated data saved to: {output_path}")
     
-    print("\nSample of validated data:")
-    print(validated_df.head())
+    # Formatear la muestra recorre todas sus celdas; solo en modo detallado
+    if os.getenv('VALIDATE_VERBOSE'):
+        print("\nSample of validated data:")
+        print(validated_df[PREVIEW_COLS].iloc[:5])
     
     print("\n" + "=" * 70)
     print("VALIDATION COMPLETE")